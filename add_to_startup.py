@@ -14,10 +14,13 @@ Instructions:
 3. Run this script to create the shortcut.
 
 Note: This script is designed for Windows operating systems.
+It requires the pywin32 library to create the shortcut, which you can install using pip:
+pip install pywin32
 """
 
+import glob
 import os
-import shutil
+import re
 import sys
 
 # Specify the name of your Python script
@@ -26,19 +29,26 @@ script_name = "timetracking.py"
 # Determine the path to the user's home directory
 user_home = os.path.expanduser("~")
 
-# Define the possible locations of pythonw.exe based on common Python installations
-possible_pythonw_paths = [
-    os.path.join(sys.exec_prefix, "pythonw.exe"),  # Check the current Python environment
-    os.path.join(user_home, "AppData", "Local", "Programs", "Python", "PythonXX", "pythonw.exe"),  # Replace XX with your Python version
-    os.path.join(user_home, "AppData", "Local", "Programs", "Python", "PythonXX-XX", "pythonw.exe"),  # Replace XX-XX with your Python version
-]
 
-# Find the first valid path to pythonw.exe
-pythonw_path = None
-for path in possible_pythonw_paths:
-    if os.path.exists(path):
-        pythonw_path = path
-        break
+def python_version(pythonw):
+    """
+    Return the (major, minor) version of a per-user Python installation from its folder name,
+    e.g. (3, 10) for Python310 or Python310-32.
+    """
+    match = re.match(r"Python(\d)(\d+)", os.path.basename(os.path.dirname(pythonw)))
+    return (int(match.group(1)), int(match.group(2))) if match else (0, 0)
+
+
+# Use pythonw.exe from the current Python environment if it has one
+pythonw_path = os.path.join(sys.exec_prefix, "pythonw.exe")
+if not os.path.exists(pythonw_path):
+    # Otherwise use the newest per-user Python installation (Python311, Python312-32, ...)
+    installed_pythonw_paths = sorted(
+        glob.glob(os.path.join(user_home, "AppData", "Local", "Programs", "Python", "Python*", "pythonw.exe")),
+        key=python_version,
+        reverse=True,
+    )
+    pythonw_path = installed_pythonw_paths[0] if installed_pythonw_paths else None
 
 if pythonw_path is None:
     print("pythonw.exe not found. Please specify the path to pythonw.exe manually.")
@@ -50,9 +60,6 @@ else:
         # Create a shortcut name for your script
         shortcut_name = "ProductivityAppTracker.lnk"
 
-        # Create the full path for the shortcut
-        shortcut_path = os.path.join(current_directory, shortcut_name)
-
         # Specify the command-line arguments for pythonw.exe
         command_args = f"{script_name}"
 
@@ -61,16 +68,22 @@ else:
         startup_shortcut_path = os.path.join(startup_folder, shortcut_name)
 
         if not os.path.exists(startup_shortcut_path):
-            # Create the shortcut
-            with open(shortcut_path, "w") as shortcut_file:
-                shortcut_file.write(f"{pythonw_path} {command_args}")
+            # Import pywin32 only when it is needed, so a missing install gets a readable message
+            from win32com.client import Dispatch
 
-            # Move the shortcut to the startup folder
-            shutil.move(shortcut_path, startup_shortcut_path)
+            # Create a real Windows shell link that runs the script with pythonw.exe
+            shell = Dispatch("WScript.Shell")
+            shortcut = shell.CreateShortCut(startup_shortcut_path)
+            shortcut.Targetpath = pythonw_path
+            shortcut.Arguments = command_args
+            shortcut.WorkingDirectory = current_directory
+            shortcut.save()
 
             print(f"Shortcut created in the startup folder: {startup_shortcut_path}")
         else:
             print("Shortcut already exists in the startup folder.")
 
+    except ImportError:
+        print("pywin32 is required to create the shortcut. Install it with: pip install pywin32")
     except Exception as e:
         print(f"An error occurred: {str(e)}")
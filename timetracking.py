@@ -6,22 +6,44 @@ Website: https://jubox.dev
 
 To run this script, ensure the following Python libraries are installed:
 - pygetwindow: for getting the current active window.
-- pandas: for data management and to write CSV files.
 - pynput: for listening to mouse and keyboard events.
-- threading and time are part of the Python Standard Library.
+- threading, time, csv and ctypes are part of the Python Standard Library.
 
 You can install the necessary libraries using pip:
-pip install pygetwindow pandas pynput PyQt5
+pip install pygetwindow pynput PyQt5
 """
 
 import pygetwindow as gw # Import the pygetwindow library to interact with native windows
-import pandas as pd # Import the pandas library to manage data and write CSV files
-from datetime import datetime, timedelta # Import datetime and timedelta from the datetime module to work with dates and times
+from datetime import datetime # Import datetime from the datetime module to work with dates and times
 from pynput import mouse, keyboard # Import mouse and keyboard listeners from the pynput library to detect user activity
 import threading # Import the threading library to run multiple threads concurrently
-import time # Import the time library to control the sleep state of the while loop in track_active_window function
+import time # Import the time library for the activity clocks and timestamps
 import logging  # Import the logging module
 import os  # Import the os module to handle file paths
+import csv  # Import the csv module to append rows to the report files
+import io  # Import the io module to control the buffering of the report files
+import re  # Import the re module to match browser tags in window titles
+import functools  # Import functools to cache the application name lookups
+
+# Win32 API access for foreground window events, unavailable outside of Windows
+try:
+    import ctypes
+    from ctypes import wintypes
+    user32 = ctypes.windll.user32
+    kernel32 = ctypes.windll.kernel32
+    WinEventProcType = ctypes.WINFUNCTYPE(None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+                                          wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+    user32.SetWinEventHook.restype = wintypes.HANDLE
+    user32.SetWinEventHook.argtypes = [wintypes.DWORD, wintypes.DWORD, wintypes.HMODULE, WinEventProcType,
+                                       wintypes.DWORD, wintypes.DWORD, wintypes.DWORD]
+    user32.UnhookWinEvent.argtypes = [wintypes.HANDLE]
+    user32.GetForegroundWindow.restype = wintypes.HWND
+    user32.GetWindowTextLengthW.argtypes = [wintypes.HWND]
+    user32.GetWindowTextW.argtypes = [wintypes.HWND, wintypes.LPWSTR, ctypes.c_int]
+    user32.GetWindowThreadProcessId.restype = wintypes.DWORD
+    user32.GetWindowThreadProcessId.argtypes = [wintypes.HWND, ctypes.POINTER(wintypes.DWORD)]
+except (ImportError, AttributeError, ValueError):
+    user32 = None
 
 #System Tray Icon with PyQt5
 from PyQt5.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QAction # Import necessary modules from PyQt5 for GUI and system tray functionality
@@ -38,72 +60,229 @@ logging.basicConfig(filename='logs/app_time_tracker.log', level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
 # Globals to track activity and data
-last_activity_time = datetime.now()
+last_activity_time = time.monotonic()  # Monotonic clock, only compared against itself
 data = []
 active_window_name = ""
-start_time = datetime.now()
+start_time = time.time()  # Wall-clock epoch seconds, formatted only when written to CSV
 
 exit_threads = False
 
+# Tracking thread and input listeners started by the script, stopped on exit
+window_tracking_thread = None
+activity_listeners = []
+
+# Win32 constants for the foreground window event hook and its message loop
+EVENT_SYSTEM_FOREGROUND = 0x0003
+EVENT_OBJECT_NAMECHANGE = 0x800C
+WINEVENT_OUTOFCONTEXT = 0x0000
+OBJID_WINDOW = 0
+WM_QUIT = 0x0012
+WM_TIMER = 0x0113
+WM_APP_RECHECK = 0x8000  # WM_APP, posted to re-check the active window right away
+IDLE_TIMEOUT = 300.0  # Seconds without activity after which the user is considered idle
+ACTIVITY_DEBOUNCE = 1.0  # Minimum seconds between two updates of the last activity time
+IDLE_CHECK_INTERVAL = 60  # Maximum seconds between idle checks while no window change occurs
+IDLE_CHECK_MARGIN_MS = 100  # Delay added to an idle check so it runs just after the timeout
+TITLE_CHANGE_INTERVAL = 1.0  # Minimum seconds between two updates caused by title changes only
+tracking_thread_id = None
+
+# Set to wake the polling loop before its 1 second timeout, e.g. on activity or exit
+wake_event = threading.Event()
+
+# Columns written to the CSV report
+FIELDS = ("Application", "Title", "Start Time", "End Time", "Total Time", "Readable Total Time")
+
+# Format of the start and end timestamps in the CSV report
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Browser tags in window titles, the captured group is the application name. The greedy
+# prefix makes the rightmost tag win, since the page title may itself mention a browser.
+BROWSER_TAG_PATTERN = re.compile(r'.* - (Google Chrome|Mozilla Firefox|Microsoft Edge)')
+
+# Pending rows are flushed to disk once either limit is reached
+FLUSH_EVERY_N = 50
+FLUSH_EVERY_SEC = 60
+last_flush_time = time.monotonic()
+
+# Size of the write buffer of the CSV report files, in bytes
+CSV_BUFFER_SIZE = 65536
+
+# Append-mode CSV file handles, opened lazily by open_csv_file
+_csv_raw_file = None
+_csv_file = None
+_csv_filename = None
+
+
+def format_csv_rows(rows):
+    """
+    Serialize rows to CSV text in memory.
+
+    :param rows: Iterable of row tuples.
+    :return: String, the CSV text of all rows.
+    """
+    text = io.StringIO()
+    csv.writer(text).writerows(rows)
+    return text.getvalue()
+
+
+def open_csv_file(filename):
+    """
+    Open (or reuse) an append-mode CSV file for the given filename.
+
+    The file handle is kept open between calls and is only reopened when the
+    filename changes (e.g. when the date rolls over to a new report file).
+    The header row is written once, when the file is new or empty.
+
+    :param filename: String, name of the file to append data to.
+    :return: Text file opened for appending.
+    """
+    global _csv_raw_file, _csv_file, _csv_filename
+
+    # Reuse the already open file if it is the same one
+    if _csv_file is not None and _csv_filename == filename:
+        return _csv_file
+
+    # Close the previous day's file before switching to the new one
+    close_csv_file()
+
+    # Rows are collected in a 64KB buffer so that a whole batch goes out in a single write.
+    # Characters that cannot be encoded (e.g. lone surrogates in a title) are replaced.
+    _csv_raw_file = open(filename, 'ab', buffering=0)
+    buffered_file = io.BufferedWriter(_csv_raw_file, buffer_size=CSV_BUFFER_SIZE)
+    _csv_file = io.TextIOWrapper(buffered_file, encoding='utf-8', errors='replace',
+                                 newline='', write_through=False)
+    _csv_filename = filename
+
+    # Write the header only once, when the file has just been created (constant time, no read)
+    if os.fstat(_csv_raw_file.fileno()).st_size == 0:
+        _csv_file.write(format_csv_rows([FIELDS]))
+
+    return _csv_file
+
+
+def close_csv_file():
+    """
+    Flush and close the CSV file handle, if one is open.
+    """
+    global _csv_raw_file, _csv_file, _csv_filename
+
+    try:
+        if _csv_file is not None:
+            _csv_file.close()
+    finally:
+        # Forget the handle even if the final flush failed, so the next write reopens the file
+        _csv_raw_file = None
+        _csv_file = None
+        _csv_filename = None
+
+
+def discard_csv_file():
+    """
+    Close the CSV file without writing what is still buffered.
+
+    Used after a failed write, so a batch that is kept for a retry is never half written.
+    """
+    global _csv_raw_file, _csv_file, _csv_filename
+
+    raw_file = _csv_raw_file
+    _csv_raw_file = None
+    _csv_file = None
+    _csv_filename = None
+
+    # Closing the raw file first makes the buffered layers drop their contents
+    if raw_file is not None:
+        try:
+            raw_file.close()
+        except OSError:
+            pass
+
+
 def save_to_csv(data, filename):
     """
-    Save the tracking data to a CSV file.
+    Append the tracking data to a CSV file.
 
-    :param data: List of dictionaries containing tracking data.
+    Timestamps and durations are formatted here, in one batch, right before writing.
+    The batch is written as a whole or not at all.
+
+    :param data: List of tuples (application, title, start, end) with epoch timestamps.
     :param filename: String, name of the file to save data.
+    :return: Boolean, True if the data was written.
     """
     try:
-        # Check if the file already exists
-        if os.path.exists(filename):
-            # If it does, read the existing data
-            existing_data = pd.read_csv(filename)
-            # Convert the existing data to a DataFrame
-            df_existing = pd.DataFrame(existing_data)
-            # Convert the new data to a DataFrame
-            df_new = pd.DataFrame(data)
-            # Concatenate the existing and new data
-            df = pd.concat([df_existing, df_new], ignore_index=True)
-        else:
-            # If the file doesn't exist, simply convert the new data to a DataFrame
-            df = pd.DataFrame(data)
-        
-        # Save (or overwrite) the CSV file
-        df.to_csv(filename, index=False)
+        fromtimestamp = datetime.fromtimestamp
+        text = format_csv_rows(
+            (app, title, fromtimestamp(start).strftime(TIME_FORMAT), fromtimestamp(end).strftime(TIME_FORMAT))
+            + format_durations(end - start)
+            for app, title, start, end in data
+        )
+
+        # Only the new rows are written, the existing file is never re-read
+        csv_file = open_csv_file(filename)
+        csv_file.write(text)
+        csv_file.flush()
+        return True
     except Exception as e:
         # Log any error encountered during the saving process
         logging.error(f"Failed to save data to CSV. Error: {str(e)}")
 
+        # Reopen the file on the next attempt instead of reusing a handle that failed
+        discard_csv_file()
+        return False
+
+
+def flush_data(force=False):
+    """
+    Write the pending rows in the global `data` list to the CSV file in one batch.
+
+    :param force: Boolean, flush even if neither batch limit has been reached.
+    """
+    global last_flush_time
+
+    now = time.monotonic()
+    if not force and len(data) < FLUSH_EVERY_N and now - last_flush_time <= FLUSH_EVERY_SEC:
+        return
+
+    # Each row goes to the report of the day it ended, even when flushed after midnight
+    batches = {}
+    for row in data:
+        batches.setdefault(get_csv_filename(row[3]), []).append(row)
+
+    # Keep the rows pending if they could not be written, they are retried on the next flush
+    failed = []
+    for filename, rows in batches.items():
+        if not save_to_csv(rows, filename):
+            failed.extend(rows)
+    data[:] = failed
+    last_flush_time = now
+
 
-def get_csv_filename():
+def get_csv_filename(timestamp=None):
     """
-    Generate a string for the CSV filename based on the current date.
+    Generate a string for the CSV filename based on the date of a timestamp.
 
+    :param timestamp: Epoch seconds, defaults to the current time.
     :return: String, formatted filename.
     """
-    # Generating a filename using the current date
-    date_str = datetime.now().strftime("%Y%m%d")
+    # Generating a filename using the date of the timestamp
+    date_str = datetime.fromtimestamp(timestamp if timestamp is not None else time.time()).strftime("%Y%m%d")
     # Returning the filename with path to 'report' folder
     return f'report/application_usage_{date_str}.csv'
 
 
+@functools.lru_cache(maxsize=4096)
 def extract_app_name(title):
     """
     Extract an estimated application name from the window title.
 
+    Results are cached per title, since the same windows come back many times a day.
+
     :param title: String, the window title.
     :return: String, estimated application name.
     """
-    # Define browser tags and corresponding application names
-    browser_tags = {
-        " - Google Chrome": "Google Chrome", 
-        " - Mozilla Firefox": "Mozilla Firefox", 
-        " - Microsoft Edge": "Microsoft Edge"
-    }
-    
     # Check for browser tags and return the corresponding application name if found
-    for tag, app_name in browser_tags.items():
-        if tag in title:
-            return app_name
+    match = BROWSER_TAG_PATTERN.match(title)
+    if match:
+        return match.group(1)
     
     # Special handling for specific applications
     if "Excel" in title:
@@ -121,118 +300,288 @@ def extract_app_name(title):
         return title  
 
 
-def format_timedelta(td):
+def format_durations(total_seconds):
     """
-    Format a timedelta object as HH:MM:SS.
+    Format a duration both as HH:MM:SS and in a readable string format.
 
-    :param td: timedelta object.
-    :return: String, formatted duration.
+    :param total_seconds: Number of seconds.
+    :return: Tuple of strings, the formatted and the readable duration.
     """
-    hours, remainder = divmod(td.seconds, 3600)
+    hours, remainder = divmod(int(total_seconds), 3600)
     minutes, seconds = divmod(remainder, 60)
-    return '{:02}:{:02}:{:02}'.format(hours, minutes, seconds)
+    return f"{hours:02}:{minutes:02}:{seconds:02}", f"{hours} hr {minutes} mins {seconds} sec"
 
-def format_readable_timedelta(td):
+
+def get_window_title(hwnd):
     """
-    Format a timedelta object in a readable string format.
+    Read the title of a native window through the Win32 API.
 
-    :param td: timedelta object.
-    :return: String, formatted readable duration.
+    :param hwnd: Integer, handle of the window.
+    :return: String, the window title.
     """
-    hours, remainder = divmod(td.seconds, 3600)
-    minutes, seconds = divmod(remainder, 60)
-    return '{} hr {} mins {} sec'.format(hours, minutes, seconds)
+    length = user32.GetWindowTextLengthW(hwnd)
+    buffer = ctypes.create_unicode_buffer(length + 1)
+    user32.GetWindowTextW(hwnd, buffer, length + 1)
+    return buffer.value
+
+
+def get_active_window_title():
+    """
+    Get the title of the currently active window.
+
+    The Win32 API is queried directly when available, which avoids building a
+    pygetwindow window object on every check.
+
+    :return: String, the window title, or "Unknown" if there is no active window.
+    """
+    if user32 is None:
+        active_window = gw.getActiveWindow()
+        return active_window.title if active_window is not None else "Unknown"
+
+    hwnd = user32.GetForegroundWindow()
+    return get_window_title(hwnd) if hwnd else "Unknown"
+
+
+def update_active_window(new_window_name):
+    """
+    Record a change of the active window and queue the usage data of the previous one.
+
+    The window is considered "Idle" when no activity has been detected for 5 minutes,
+    and the idle period is backdated to the last detected activity.
+
+    :param new_window_name: String, title of the window that is currently active.
+    """
+    global active_window_name, start_time
+
+    # Check for inactivity (considered idle if no activity for IDLE_TIMEOUT seconds)
+    idle_seconds = time.monotonic() - last_activity_time
+    if idle_seconds > IDLE_TIMEOUT:
+        new_window_name = "Idle"
+        
+    # Check if the active window has changed. Consecutive idle checks keep the same "Idle"
+    # name, so a whole idle period is logged as a single row once activity resumes.
+    if active_window_name != new_window_name:
+        # Record the end time of the previous activity
+        end_time = time.time()
+        
+        # An idle period starts at the last activity rather than when the timeout expired
+        if new_window_name == "Idle":
+            end_time = max(start_time, end_time - idle_seconds)
+        
+        # If the active window name is not an empty string, log the data
+        if active_window_name:  
+            # Append the data to the global data list, it is formatted and written to CSV in batches
+            data.append((extract_app_name(active_window_name), active_window_name, start_time, end_time))
+            
+            # Update the start time for the next activity
+            start_time = end_time
+        
+        # Update the active window name
+        active_window_name = new_window_name
+    
+    # Write the pending rows once enough have accumulated or enough time has passed
+    flush_data()
+
+
+def wake_tracking_thread(message):
+    """
+    Wake the tracking thread so it re-checks the active window right away.
+
+    The polling loop is woken through the `wake_event`, the event loop receives the
+    message in its message queue, if it is running.
+
+    :param message: Integer, Win32 message identifier (e.g. WM_QUIT).
+    """
+    wake_event.set()
+    if user32 is not None and tracking_thread_id:
+        user32.PostThreadMessageW(tracking_thread_id, message, 0, 0)
+
+
+def stop_tracking():
+    """
+    Signal the tracking thread to write its pending data and exit.
+    """
+    global exit_threads
+    exit_threads = True
+
+    # Stop the tracking thread's loop, which otherwise waits for the next event or timeout
+    wake_tracking_thread(WM_QUIT)
+
+
+def run_window_event_loop():
+    """
+    Track the active window through Win32 window event hooks.
+
+    Instead of polling, Windows calls back into this thread only when the foreground
+    window changes, or when the title of the foreground window changes (e.g. switching
+    browser tabs). Title changes are only hooked for the thread that owns the foreground
+    window, so other applications never wake the tracker. A timer message is posted when the
+    idle timeout would expire, and at least every IDLE_CHECK_INTERVAL seconds, so that idle
+    periods and pending batches are still handled while nothing changes.
+
+    :return: Boolean, False if the event hook could not be installed.
+    """
+    global tracking_thread_id
+
+    # Foreground window and the title-change hook scoped to the thread that owns it
+    foreground_hwnd = None
+    name_change_hook = None
+
+    # Title-only changes are applied at most once per TITLE_CHANGE_INTERVAL, a one-shot
+    # timer picks up the latest title when changes arrive faster than that
+    last_title_update = 0.0
+    title_timer_id = None
+
+    def watch_foreground_window(hwnd):
+        nonlocal foreground_hwnd, name_change_hook
+
+        if name_change_hook:
+            user32.UnhookWinEvent(name_change_hook)
+            name_change_hook = None
+
+        foreground_hwnd = hwnd
+        if hwnd:
+            process_id = wintypes.DWORD()
+            thread_id = user32.GetWindowThreadProcessId(hwnd, ctypes.byref(process_id))
+            name_change_hook = user32.SetWinEventHook(EVENT_OBJECT_NAMECHANGE, EVENT_OBJECT_NAMECHANGE, 0,
+                                                      name_change_callback, process_id.value, thread_id,
+                                                      WINEVENT_OUTOFCONTEXT)
+
+    def on_foreground_change(hook, event, hwnd, id_object, id_child, event_thread, event_time):
+        nonlocal last_title_update
+        watch_foreground_window(hwnd)
+        last_title_update = time.monotonic()
+        update_active_window(get_window_title(hwnd) if hwnd else "Unknown")
+
+    def on_name_change(hook, event, hwnd, id_object, id_child, event_thread, event_time):
+        nonlocal last_title_update, title_timer_id
+
+        # Only title changes of the foreground window itself are relevant
+        if id_object != OBJID_WINDOW or id_child != 0 or hwnd != foreground_hwnd:
+            return
+
+        # A window rewriting its title (progress, counters) must not log a row per change
+        now = time.monotonic()
+        if now - last_title_update < TITLE_CHANGE_INTERVAL:
+            if title_timer_id is None:
+                title_timer_id = user32.SetTimer(None, 0, int(TITLE_CHANGE_INTERVAL * 1000), None)
+            return
+
+        last_title_update = now
+        update_active_window(get_window_title(hwnd))
+
+    # Keep references to the callbacks for as long as the hooks are installed
+    foreground_callback = WinEventProcType(on_foreground_change)
+    name_change_callback = WinEventProcType(on_name_change)
+    hook = user32.SetWinEventHook(EVENT_SYSTEM_FOREGROUND, EVENT_SYSTEM_FOREGROUND, 0,
+                                  foreground_callback, 0, 0, WINEVENT_OUTOFCONTEXT)
+    if not hook:
+        logging.error("Failed to install the foreground window event hook, falling back to polling.")
+        return False
+
+    def schedule_idle_check(timer):
+        # Fire right after the idle timeout would expire, and at least every IDLE_CHECK_INTERVAL
+        remaining = last_activity_time + IDLE_TIMEOUT - time.monotonic()
+        delay = min(remaining, IDLE_CHECK_INTERVAL) if remaining > 0 else IDLE_CHECK_INTERVAL
+        return user32.SetTimer(None, timer, int(delay * 1000) + IDLE_CHECK_MARGIN_MS, None)
+
+    tracking_thread_id = kernel32.GetCurrentThreadId()
+    timer_id = schedule_idle_check(0)
+
+    try:
+        # Record the window that is already active before the first event arrives
+        watch_foreground_window(user32.GetForegroundWindow())
+        update_active_window(get_active_window_title())
+
+        # Standard Win32 message pump, the hook callbacks are dispatched from here
+        msg = wintypes.MSG()
+        while not exit_threads and user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            if msg.message == WM_TIMER and title_timer_id is not None and msg.wParam == title_timer_id:
+                # The delayed title check is one-shot
+                user32.KillTimer(None, title_timer_id)
+                title_timer_id = None
+                last_title_update = time.monotonic()
+            if msg.message in (WM_TIMER, WM_APP_RECHECK):
+                # Re-evaluate the current window to detect idle transitions
+                update_active_window(get_active_window_title())
+            if msg.message == WM_TIMER and msg.wParam == timer_id:
+                # Replacing the timer with the same id moves its next tick
+                timer_id = schedule_idle_check(timer_id)
+            user32.TranslateMessage(ctypes.byref(msg))
+            user32.DispatchMessageW(ctypes.byref(msg))
+    finally:
+        tracking_thread_id = None
+        user32.KillTimer(None, timer_id)
+        if title_timer_id is not None:
+            user32.KillTimer(None, title_timer_id)
+        user32.UnhookWinEvent(hook)
+        watch_foreground_window(None)
+
+    return True
 
 
 def track_active_window():
     """
     Continuously tracks the active window title and logs the usage data.
 
-    This function runs in an infinite loop, constantly checking for the active window title. 
-    When the active window changes, it logs the usage data to the global `data` list and writes it to a CSV file.
+    On Windows the tracking is driven by foreground-change events. Where the event hook is
+    unavailable, it falls back to checking the active window title once per second.
+    When the active window changes, it logs the usage data to the global `data` list, which is written to a CSV file in batches.
     It also handles idle time by logging it as "Idle" when no activity is detected for a specified period.
     """
-    global last_activity_time, data, active_window_name, start_time, exit_threads
-    
+    global active_window_name, start_time
+
     # Initialize thread's do_run attribute to True
     threading.current_thread().do_run = True
 
     try:
-        # Continuous loop to keep the tracking active at all times
-        while not exit_threads:
-            # Get the currently active window's title
-            active_window = gw.getActiveWindow()
-            # Check if we got a window title, else assign "Unknown"
-            new_window_name = active_window.title if active_window is not None else "Unknown"
-            
-            # Check for inactivity (considered idle if no activity for 5 minutes)
-            if datetime.now() - last_activity_time > timedelta(minutes=5):
-                new_window_name = "Idle"
-                
-            # Check if the active window has changed
-            if active_window_name != new_window_name:
-                # Record the end time of the previous activity
-                end_time = datetime.now()
-                
-                # If the active window name is not an empty string, log the data
-                if active_window_name:  
-                    # Calculate and format the total time spent on the activity
-                    total_time = end_time - start_time
-                    formatted_total_time = format_timedelta(total_time)
-                    readable_total_time = format_readable_timedelta(total_time)
-                    
-                    # Append the data to the global data list and save it to CSV, then clear the list
-                    data.append({
-                        "Application": extract_app_name(active_window_name),
-                        "Title": active_window_name,
-                        "Start Time": start_time.strftime("%Y-%m-%d %H:%M:%S"),
-                        "End Time": end_time.strftime("%Y-%m-%d %H:%M:%S"),
-                        "Total Time": formatted_total_time,
-                        "Readable Total Time": readable_total_time
-                    })
-                    
-                    save_to_csv(data, get_csv_filename())
-                    data.clear()
-                    
-                    # Update the start time for the next activity
-                    start_time = end_time
+        # Prefer the event hook and only poll when it cannot be used
+        if user32 is None or not run_window_event_loop():
+            # Bind the functions used on every iteration to local names to skip the global lookups
+            update = update_active_window
+            get_title = get_active_window_title
+            wait = wake_event.wait
+            clear = wake_event.clear
+
+            # Continuous loop to keep the tracking active at all times
+            while not exit_threads:
+                # Get the currently active window's title
+                update(get_title())
                 
-                # Update the active window name
-                active_window_name = new_window_name
+                # Wait up to 1 second before checking the active window again, or less if woken
+                wait(timeout=1.0)
+                clear()
             
-            # Pause the loop for 1 second before checking the active window again
-            time.sleep(1)
-            
-    # Handle manual interruption gracefully and log the last activity
+    # Handle manual interruption gracefully, the last activity is logged below
     except KeyboardInterrupt:
-        end_time = datetime.now()
-        if active_window_name:
-            total_time = end_time - start_time
-            formatted_total_time = format_timedelta(total_time)
-            readable_total_time = format_readable_timedelta(total_time)
-            
-            data.append({
-                "Application": extract_app_name(active_window_name),
-                "Title": active_window_name,
-                "Start Time": start_time.strftime("%Y-%m-%d %H:%M:%S"),
-                "End Time": end_time.strftime("%Y-%m-%d %H:%M:%S"),
-                "Total Time": formatted_total_time,
-                "Readable Total Time": readable_total_time
-            })
-            
-        save_to_csv(data, get_csv_filename())
+        pass
         
     # Log unexpected errors
     except Exception as e:
         logging.error(f"Unexpected error in track_active_window. Error: {str(e)}")
 
+    # Log the last activity and write whatever is still pending before the thread exits
+    if active_window_name:
+        data.append((extract_app_name(active_window_name), active_window_name, start_time, time.time()))
+    flush_data(force=True)
+    close_csv_file()
+
 
 def on_activity(*args):
     """
     Update the last activity time whenever mouse or keyboard activity is detected.
+
+    Mouse moves are reported at a very high rate, so the time is updated at most once per second.
     """
     global last_activity_time
-    last_activity_time = datetime.now()
+    now = time.monotonic()
+    if now - last_activity_time <= ACTIVITY_DEBOUNCE:
+        return
+    last_activity_time = now
+
+    # Let the event loop notice right away that an idle period has ended
+    if active_window_name == "Idle":
+        wake_tracking_thread(WM_APP_RECHECK)
 
 
 def create_tray_icon():
@@ -266,29 +615,44 @@ def create_tray_icon():
 
 def exit_application():
     """
-    Set a global variable to signal the exit of threads
+    Stop the tracking thread and the input listeners, then quit the tray application
     """
 
-    global exit_threads
-    exit_threads = True
+    stop_tracking()
+    
+    # Wait until the tracking thread has logged the last activity and written its pending data
+    if window_tracking_thread is not None:
+        window_tracking_thread.join()
+    
+    # Stop the input listeners so the main thread can return
+    for listener in activity_listeners:
+        listener.stop()
     
     # Quit the application to cleanly exit
-    app.quit()
-
-
-# Additional thread to run the tray icon
-tray_thread = threading.Thread(target=create_tray_icon)
-tray_thread.start()
-
+    QApplication.instance().quit()
 
 
 if __name__ == "__main__":
+    # Additional thread to run the tray icon
+    tray_thread = threading.Thread(target=create_tray_icon)
+    tray_thread.start()
+
     # Initialize a separate thread to run the active window tracking function
     window_tracking_thread = threading.Thread(target=track_active_window)
     window_tracking_thread.start()
     
     # Start mouse and keyboard listeners to detect user activity
-    with mouse.Listener(on_move=on_activity, on_click=on_activity, on_scroll=on_activity) as m_listener, \
-         keyboard.Listener(on_press=on_activity) as k_listener:
-        m_listener.join()
-        k_listener.join()
+    try:
+        with mouse.Listener(on_move=on_activity, on_click=on_activity, on_scroll=on_activity) as m_listener, \
+             keyboard.Listener(on_press=on_activity) as k_listener:
+            activity_listeners.extend((m_listener, k_listener))
+            # The tray icon may have been used to exit before the listeners were registered
+            if exit_threads:
+                m_listener.stop()
+                k_listener.stop()
+            m_listener.join()
+            k_listener.join()
+    except KeyboardInterrupt:
+        # Let the tracking thread log the last activity and write its pending data
+        stop_tracking()
+        window_tracking_thread.join()